@@ -5,6 +5,7 @@ import asyncio
 import os
 import signal
 import sys
+from collections import deque
 from collections.abc import AsyncIterator
 from pathlib import Path
 
@@ -21,13 +22,12 @@ from mistralai.models import (
 SAMPLE_RATE = 16000
 CHUNK_DURATION_MS = 100
 CHUNK_SAMPLES = int(SAMPLE_RATE * CHUNK_DURATION_MS / 1000)
+MAX_BUFFERED_CHUNKS = 50  # 5s of audio; oldest chunks are dropped beyond this
 ENV_FILE = Path(__file__).parent.parent / ".env"
 
 
-async def test_api_key(api_key: str) -> bool:
+async def test_api_key(client: Mistral, audio_format: AudioFormat) -> bool:
     """Test API key by connecting to the realtime transcription endpoint."""
-    client = Mistral(api_key=api_key)
-    audio_format = AudioFormat(encoding="pcm_s16le", sample_rate=SAMPLE_RATE)
 
     async def empty_audio() -> AsyncIterator[bytes]:
         yield b"\x00" * 3200  # Single silent frame
@@ -54,49 +54,61 @@ def prompt_for_api_key() -> str:
 async def iter_microphone(sample_rate: int) -> AsyncIterator[bytes]:
     """Yield PCM chunks from microphone using sounddevice."""
     loop = asyncio.get_event_loop()
-    queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+    # deque append/popleft are thread-safe, so the PortAudio thread only has
+    # to wake the loop when the consumer is idle rather than once per chunk.
+    # maxlen bounds memory if the network stalls.
+    chunks: deque[bytes] = deque(maxlen=MAX_BUFFERED_CHUNKS)
+    ready = asyncio.Event()
 
     def audio_callback(indata: np.ndarray, frames: int, time_info, status) -> None:
         if status:
             print(f"Audio status: {status}", file=sys.stderr)
-        pcm_bytes = (indata * 32767).astype(np.int16).tobytes()
-        loop.call_soon_threadsafe(queue.put_nowait, pcm_bytes)
+        # Stream is opened as int16, so this is already PCM s16le; tobytes()
+        # is the one copy needed since PortAudio reuses its buffer.
+        pcm_bytes = indata.tobytes()
+        chunks.append(pcm_bytes)
+        if not ready.is_set():
+            loop.call_soon_threadsafe(ready.set)
 
     with sd.InputStream(
         samplerate=sample_rate,
         channels=1,
-        dtype=np.float32,
+        dtype=np.int16,
         blocksize=CHUNK_SAMPLES,
         callback=audio_callback,
     ):
         while True:
-            chunk = await queue.get()
-            if chunk is None:
-                break
-            yield chunk
+            await ready.wait()
+            ready.clear()
+            while chunks:
+                yield chunks.popleft()
 
 
 async def main() -> None:
     load_dotenv()
 
     api_key = os.environ.get("MISTRAL_API_KEY")
-    if not api_key:
+    prompted = not api_key
+    if prompted:
         api_key = prompt_for_api_key()
         if not api_key:
             print("Error: No API key provided", file=sys.stderr)
             sys.exit(1)
 
+    # Client construction is synchronous; keep it off the event loop and
+    # share the one instance between the key check and transcription.
+    client = await asyncio.to_thread(Mistral, api_key=api_key)
+    audio_format = AudioFormat(encoding="pcm_s16le", sample_rate=SAMPLE_RATE)
+
+    if prompted:
         print("Testing API key...", file=sys.stderr)
-        if not await test_api_key(api_key):
+        if not await test_api_key(client, audio_format):
             print("Error: Invalid API key", file=sys.stderr)
             sys.exit(1)
 
         ENV_FILE.write_text(f"MISTRAL_API_KEY={api_key}\n")
         print(f"Looks good. I stored it in .env\n", file=sys.stderr)
 
-    client = Mistral(api_key=api_key)
-    audio_format = AudioFormat(encoding="pcm_s16le", sample_rate=SAMPLE_RATE)
-
     print("Listening... (Ctrl+C to stop)", file=sys.stderr)
 
     try:
@@ -120,4 +132,11 @@ def signal_handler(sig, frame) -> None:
 
 if __name__ == "__main__":
     signal.signal(signal.SIGINT, signal_handler)
-    asyncio.run(main())
+    loop_factory = None
+    try:
+        import uvloop
+
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        pass
+    asyncio.run(main(), loop_factory=loop_factory)